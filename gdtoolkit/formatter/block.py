@@ -56,7 +56,7 @@ def format_block(
             statement, context
         )
         if len(context.annotations) > 0:
-            lines = prepend_annotations_to_formatted_line(lines[0], context) + lines[1:]
+            lines[:1] = prepend_annotations_to_formatted_line(lines[0], context)
         formatted_lines += lines
         previous_statement_name = statement.data
     dedent_line_number = _find_dedent_line_number(
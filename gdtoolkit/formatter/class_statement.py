@@ -22,42 +22,29 @@ from .expression_to_str import expression_to_str
 
 
 def format_class_statement(statement: Tree, context: Context) -> Outcome:
-    handlers = {
-        "pass_stmt": partial(format_simple_statement, "pass"),
-        "enum_stmt": _format_enum_statement,
-        "signal_stmt": _format_signal_statement,
-        "extends_stmt": _format_extends_statement,
-        "classname_stmt": _format_classname_statement,
-        "classname_extends_stmt": _format_classname_extends_statement,
-        "class_var_stmt": _format_var_statement,
-        "static_class_var_stmt": lambda s, c: _format_var_statement(
-            s.children[0], c, "static "
-        ),
-        "const_stmt": format_const_statement,
-        "docstr_stmt": _format_docstring_statement,
-        "class_def": _format_class_statement,
-        "func_def": _format_func_statement,
-        "static_func_def": lambda s, c: _format_func_statement(
-            s.children[0], c, "static "
-        ),
-        "annotation": format_standalone_annotation,
-        "property_body_def": format_property_body,
-    }  # type: Dict[str, Callable]
-    return handlers[statement.data](statement, context)
+    # most frequent statements are dispatched directly, the rest via table
+    statement_type = statement.data
+    if statement_type == "class_var_stmt":
+        return _format_var_statement(statement, context)
+    if statement_type == "func_def":
+        return _format_func_statement(statement, context)
+    if statement_type == "annotation":
+        return format_standalone_annotation(statement, context)
+    return _STATEMENT_HANDLERS[statement_type](statement, context)
 
 
 def _format_signal_statement(statement: Tree, context: Context) -> Outcome:
-    if len(statement.children) == 1 or len(statement.children[1].children) == 0:
-        return format_simple_statement(
-            f"signal {statement.children[0].value}", statement, context
-        )
+    children = statement.children
+    signal_prefix = f"signal {children[0].value}"
+    if len(children) == 1 or len(children[1].children) == 0:
+        return format_simple_statement(signal_prefix, statement, context)
     expression_context = ExpressionContext(
-        f"signal {statement.children[0].value}",
+        signal_prefix,
         get_line(statement),
         "",
         get_end_line(statement),
     )
-    signal_args = statement.children[-1]
+    signal_args = children[-1]
     return format_concrete_expression(signal_args, expression_context, context)
 
 
@@ -77,18 +64,13 @@ def _format_extends_statement(statement: Tree, context: Context) -> Outcome:
     optional_attributes = (
         ""
         if len(statement.children) == 1
-        else ".{}".format(
-            ".".join([expression_to_str(child) for child in statement.children[1:]])
-        )
+        else "." + ".".join(map(expression_to_str, statement.children[1:]))
     )
+    extendee = expression_to_str(statement.children[0])
     formatted_lines: FormattedLines = [
         (
             get_line(statement),
-            "{}extends {}{}".format(
-                context.indent_string,
-                expression_to_str(statement.children[0]),
-                optional_attributes,
-            ),
+            f"{context.indent_string}extends {extendee}{optional_attributes}",
         )
     ]
     return (formatted_lines, last_processed_line_no)
@@ -100,24 +82,16 @@ def _format_classname_extends_statement(statement: Tree, context: Context) -> Ou
     optional_attributes = (
         ""
         if len(statement.children) <= extendee_pos + 1
-        else ".{}".format(
-            ".".join(
-                [
-                    expression_to_str(child)
-                    for child in statement.children[extendee_pos + 1 :]
-                ]
-            )
-        )
+        else "."
+        + ".".join(map(expression_to_str, statement.children[extendee_pos + 1 :]))
     )
+    class_name = statement.children[1].value
+    extendee = expression_to_str(statement.children[extendee_pos])
     formatted_lines: FormattedLines = [
         (
             get_line(statement),
-            "{}class_name {} extends {}{}".format(
-                context.indent_string,
-                statement.children[1].value,
-                expression_to_str(statement.children[extendee_pos]),
-                optional_attributes,
-            ),
+            f"{context.indent_string}class_name {class_name}"
+            f" extends {extendee}{optional_attributes}",
         )
     ]
     return (formatted_lines, last_processed_line_no)
@@ -132,7 +106,7 @@ def _format_var_statement(
     concrete_var_statement = statement.children[0]
     if has_inline_property_body(concrete_var_statement):
         inline_property_body = concrete_var_statement.children[-1]
-        formatted_lines = formatted_lines[:-1] + append_property_body_to_formatted_line(
+        formatted_lines[-1:] = append_property_body_to_formatted_line(
             formatted_lines[-1], inline_property_body, context
         )
     return formatted_lines, last_processed_line
@@ -180,7 +154,7 @@ def _format_class_statement(statement: Tree, context: Context) -> Outcome:
             format_class_statement,
             context.create_child_context(last_processed_line_no),
         )
-        formatted_lines += class_lines
+        formatted_lines.extend(class_lines)
 
     return (formatted_lines, last_processed_line_no)
 
@@ -188,7 +162,7 @@ def _format_class_statement(statement: Tree, context: Context) -> Outcome:
 def _extract_extends_base(extends: Tree) -> str:
     # Falls der ganze Ausdruck zusammengesetzt ist (z. B. "res://file.gd".X.Y)
     if len(extends.children) > 1:
-        return ".".join([expression_to_str(child) for child in extends.children])
+        return ".".join(map(expression_to_str, extends.children))
     return expression_to_str(extends.children[0])
 
 
@@ -204,7 +178,7 @@ def _format_func_statement(
         format_func_statement,
         context.create_child_context(last_processed_line_no),
     )
-    formatted_lines += func_lines
+    formatted_lines.extend(func_lines)
     return (formatted_lines, last_processed_line_no)
 
 
@@ -234,3 +208,24 @@ def _format_enum_statement(statement: Tree, context: Context) -> Outcome:
     )
     enum_body = actual_enum.children[-1]
     return format_concrete_expression(enum_body, expression_context, context)
+
+
+_STATEMENT_HANDLERS = {
+    "pass_stmt": partial(format_simple_statement, "pass"),
+    "enum_stmt": _format_enum_statement,
+    "signal_stmt": _format_signal_statement,
+    "extends_stmt": _format_extends_statement,
+    "classname_stmt": _format_classname_statement,
+    "classname_extends_stmt": _format_classname_extends_statement,
+    "class_var_stmt": _format_var_statement,
+    "static_class_var_stmt": lambda s, c: _format_var_statement(
+        s.children[0], c, "static "
+    ),
+    "const_stmt": format_const_statement,
+    "docstr_stmt": _format_docstring_statement,
+    "class_def": _format_class_statement,
+    "func_def": _format_func_statement,
+    "static_func_def": lambda s, c: _format_func_statement(s.children[0], c, "static "),
+    "annotation": format_standalone_annotation,
+    "property_body_def": format_property_body,
+}  # type: Dict[str, Callable]
@@ -19,31 +19,43 @@ def gather_comments(
 
 
 def gather_standalone_comments(
-    gdscript_code: str, comment_parse_tree: Tree
+    gdscript_code: str,
+    comment_parse_tree: Tree,
+    gdscript_code_lines: Optional[List[str]] = None,
 ) -> List[Optional[str]]:
     comments = _gather_comments_by_prefix_regex(
-        gdscript_code, comment_parse_tree, r"^\s*$"
+        gdscript_code, comment_parse_tree, r"^\s*$", gdscript_code_lines
     )
     return _rstrip_comments(comments)
 
 
 def gather_inline_comments(
-    gdscript_code: str, comment_parse_tree: Tree
+    gdscript_code: str,
+    comment_parse_tree: Tree,
+    gdscript_code_lines: Optional[List[str]] = None,
 ) -> List[Optional[str]]:
     comments = _gather_comments_by_prefix_regex(
-        gdscript_code, comment_parse_tree, r"[^\s]+"
+        gdscript_code, comment_parse_tree, r"[^\s]+", gdscript_code_lines
     )
     return _rstrip_comments(comments)
 
 
 def _gather_comments_by_prefix_regex(
-    gdscript_code: str, comment_parse_tree: Tree, prefix_regex: str
+    gdscript_code: str,
+    comment_parse_tree: Tree,
+    prefix_regex: str,
+    gdscript_code_lines: Optional[List[str]],
 ) -> List[Optional[str]]:
-    """prefix means all line characters before comment"""
+    """prefix means all line characters before comment,
+    gdscript_code_lines (if given) must be gdscript_code.splitlines()"""
     line_to_comment_mapping = {
         get_line(comment): comment for comment in comment_parse_tree.children
     }  # type: Dict[int, Tree]
-    lines = gdscript_code.splitlines()
+    lines = (
+        gdscript_code_lines
+        if gdscript_code_lines is not None
+        else gdscript_code.splitlines()
+    )
     comments = [None]  # type: List[Optional[str]]
     regex = re.compile(prefix_regex)
     for line_number, line in enumerate(lines):
@@ -17,32 +17,35 @@ def format_const_statement(statement: Tree, context: Context) -> Outcome:
 
 
 def _format_const_assigned_statement(statement: Tree, context: Context) -> Outcome:
+    children = statement.children
     expression_context = ExpressionContext(
-        f"const {statement.children[0].value} = ",
+        f"const {children[0].value} = ",
         get_line(statement),
         "",
         get_end_line(statement),
     )
-    return format_expression(statement.children[-1], expression_context, context)
+    return format_expression(children[-1], expression_context, context)
 
 
 def _format_const_typed_assigned_statement(
     statement: Tree, context: Context
 ) -> Outcome:
+    children = statement.children
     expression_context = ExpressionContext(
-        f"const {statement.children[0].value}: {statement.children[1].value} = ",
+        f"const {children[0].value}: {children[1].value} = ",
         get_line(statement),
         "",
         get_end_line(statement),
     )
-    return format_expression(statement.children[-1], expression_context, context)
+    return format_expression(children[-1], expression_context, context)
 
 
 def _format_const_inferred_statement(statement: Tree, context: Context) -> Outcome:
+    children = statement.children
     expression_context = ExpressionContext(
-        f"const {statement.children[0].value} := ",
+        f"const {children[0].value} := ",
         get_line(statement),
         "",
         get_end_line(statement),
     )
-    return format_expression(statement.children[-1], expression_context, context)
+    return format_expression(children[-1], expression_context, context)
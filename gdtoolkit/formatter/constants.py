@@ -3,6 +3,7 @@ from types import MappingProxyType
 
 TAB_INDENT_SIZE = 4
 INLINE_COMMENT_OFFSET = 2
+PARSE_CACHE_SIZE = 32
 
 DEFAULT_SURROUNDING_EMPTY_LINES_TABLE = MappingProxyType(
     {
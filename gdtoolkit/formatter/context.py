@@ -27,7 +27,8 @@ class Context:
         self.indent_string = self.single_indent_string * (
             self.indent // self.single_indent
         )
-        self.indent_regex = re.compile(f"^{self.single_indent_string[0]}+")
+        # matches (possibly empty) indentation at the beginning of a line
+        self.indent_regex = re.compile(f"{self.single_indent_string[0]}*")
         self.previously_processed_line_number = previously_processed_line_number
         self.max_line_length = max_line_length
         self.gdscript_code_lines = gdscript_code_lines
@@ -12,6 +12,9 @@ from .expression_utils import (
 from .function_statement_to_str import function_statement_to_str
 
 
+_CACHE_ATTRIBUTE = "_gdtoolkit_expression_str"
+
+
 def standalone_expression_to_str(expression: Node) -> str:
     expression = remove_outer_parentheses(expression)
     return expression_to_str(expression)
@@ -28,6 +31,19 @@ def expression_to_str(expression: Node) -> str:
         if expression.type in token_handlers:
             return token_handlers[expression.type](expression)
         return expression.value
+    # the same subtrees are stringified many times while trying out
+    # different layouts, so the result is memoized on the (immutable) tree
+    cached = getattr(expression, _CACHE_ATTRIBUTE, None)
+    if cached is None:
+        cached = _tree_to_str(expression)
+        try:
+            setattr(expression, _CACHE_ATTRIBUTE, cached)
+        except AttributeError:
+            pass
+    return cached
+
+
+def _tree_to_str(expression: Tree) -> str:
     return {
         "expr": lambda e: standalone_expression_to_str(e.children[0]),
         "assnmnt_expr": _operator_chain_based_expression_to_str,
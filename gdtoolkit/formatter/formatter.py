@@ -1,4 +1,5 @@
 import re
+from functools import lru_cache
 from typing import List, Optional
 
 from lark import Tree
@@ -9,8 +10,9 @@ from .constants import (
     TAB_INDENT_SIZE,
     INLINE_COMMENT_OFFSET,
     GLOBAL_SCOPE_SURROUNDING_EMPTY_LINES_TABLE,
+    PARSE_CACHE_SIZE,
 )
-from .types import FormattedLines
+from .types import FormattedLine, FormattedLines
 from .block import format_block
 from .class_statement import format_class_statement
 from .comments import (
@@ -26,20 +28,35 @@ def format_code(
     parse_tree: Optional[Tree] = None,
     comment_parse_tree: Optional[Tree] = None,
 ) -> str:
-    parse_tree = (
-        parse_tree
-        if parse_tree is not None
-        else parser.parse(gdscript_code, gather_metadata=True)
+    return _format_code_with_trees(
+        gdscript_code,
+        max_line_length,
+        spaces_for_indent,
+        parse_tree if parse_tree is not None else _parse(gdscript_code),
+        (
+            comment_parse_tree
+            if comment_parse_tree is not None
+            else _parse_comments(gdscript_code)
+        ),
+    )
+
+
+def _format_code_with_trees(
+    gdscript_code: str,
+    max_line_length: int,
+    spaces_for_indent: Optional[int],
+    parse_tree: Tree,
+    comment_parse_tree: Tree,
+) -> str:
+    gdscript_code_lines = gdscript_code.splitlines()
+    standalone_comments = gather_standalone_comments(
+        gdscript_code, comment_parse_tree, gdscript_code_lines
     )
-    comment_parse_tree = (
-        comment_parse_tree
-        if comment_parse_tree is not None
-        else parser.parse_comments(gdscript_code)
+    inline_comments = gather_inline_comments(
+        gdscript_code, comment_parse_tree, gdscript_code_lines
     )
-    gdscript_code_lines = [
-        "",
-        *gdscript_code.splitlines(),
-    ]  # type: List[str]
+    # from now on lines are indexed by (1-based) line numbers
+    gdscript_code_lines.insert(0, "")
     formatted_lines = []  # type: FormattedLines
     single_indent_size = (
         TAB_INDENT_SIZE if spaces_for_indent is None else spaces_for_indent
@@ -53,10 +70,8 @@ def format_code(
         previously_processed_line_number=0,
         max_line_length=max_line_length,
         gdscript_code_lines=gdscript_code_lines,
-        standalone_comments=gather_standalone_comments(
-            gdscript_code, comment_parse_tree
-        ),
-        inline_comments=gather_inline_comments(gdscript_code, comment_parse_tree),
+        standalone_comments=standalone_comments,
+        inline_comments=inline_comments,
     )
     formatted_lines, _ = format_block(
         parse_tree.children,
@@ -65,138 +80,203 @@ def format_code(
         GLOBAL_SCOPE_SURROUNDING_EMPTY_LINES_TABLE,
     )
     formatted_lines.append((None, ""))
-    formatted_lines = _add_inline_comments(formatted_lines, context.inline_comments)
-    formatted_lines = _add_standalone_comments(
-        formatted_lines, context.standalone_comments, context.indent_regex
+    formatted_lines = _postprocess_lines(
+        formatted_lines,
+        context.inline_comments,
+        context.standalone_comments,
+        context.indent_regex,
     )
-    formatted_lines = _cleanup_region_spacing(formatted_lines)
 
-    return "\n".join([line for _, line in formatted_lines])
+    return "\n".join(line for _, line in formatted_lines)
 
 
-def _add_inline_comments(
-    formatted_lines: FormattedLines, comments: List[Optional[str]]
-) -> FormattedLines:
-    remaining_comments = comments[:]
-    postprocessed_lines = []  # type: FormattedLines
-    comment_offset = " " * INLINE_COMMENT_OFFSET
+# the same code is often formatted more than once (e.g. to check stability),
+# parse trees are not modified by the formatter so they can be shared
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse(gdscript_code: str) -> Tree:
+    return parser.parse(gdscript_code, gather_metadata=True)
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_comments(gdscript_code: str) -> Tree:
+    return parser.parse_comments(gdscript_code)
+
+
+_NO_REGION_MARKER = 0
+_REGION_START = 1
+_REGION_END = 2
 
-    for line_no, line in reversed(formatted_lines):
-        if line_no is None:
-            postprocessed_lines.append((line_no, line))
-            continue
-        comments = remaining_comments[line_no:]
-        remaining_comments = remaining_comments[:line_no]
-        if comments != []:
-            new_line = comment_offset.join(
-                [line] + [c for c in comments if c is not None]
-            )
-            postprocessed_lines.append((line_no, new_line))
-        else:
-            postprocessed_lines.append((line_no, line))
 
-    return list(reversed(postprocessed_lines))
+class _PostprocessedLines:
+    """Formatted lines built back to front (stored reversed until to_list()).
+    Blank lines are held back until the preceding non-blank line is known
+    so that spacing around #region/#endregion can be fixed on the fly.
+    """
+
+    def __init__(self) -> None:
+        self._reversed_lines = []  # type: FormattedLines
+        self._pending_blank_lines = []  # type: List[FormattedLine]
+        self._first_line_region_marker = _NO_REGION_MARKER
+
+    def prepend(
+        self, formatted_line: FormattedLine, stripped_line: Optional[str] = None
+    ) -> None:
+        """stripped_line (if known) must be equal to formatted_line[1].strip()"""
+        stripped = formatted_line[1].strip() if stripped_line is None else stripped_line
+        if stripped == "":
+            self._pending_blank_lines.append(formatted_line)
+            return
+        region_marker = _get_region_marker(stripped)
+        if self._pending_blank_lines or region_marker == _REGION_END:
+            self._flush_blank_lines(region_marker)
+        self._reversed_lines.append(formatted_line)
+        self._first_line_region_marker = region_marker
+
+    def first_line(self) -> str:
+        if self._pending_blank_lines:
+            return self._pending_blank_lines[-1][1]
+        return self._reversed_lines[-1][1]
+
+    def drop_leading_blank_lines(self) -> None:
+        self._pending_blank_lines = []
+
+    def to_list(self) -> FormattedLines:
+        """finalizes the lines, no lines can be prepended afterwards"""
+        self._flush_blank_lines(_NO_REGION_MARKER)
+        self._reversed_lines.reverse()
+        return self._reversed_lines
+
+    def _flush_blank_lines(self, preceding_line_region_marker: int) -> None:
+        blank_lines = self._pending_blank_lines
+        self._pending_blank_lines = []
+        if self._first_line_region_marker == _REGION_END:
+            # no blank lines before #endregion
+            return
+        self._reversed_lines.extend(blank_lines)
+        if (
+            preceding_line_region_marker == _REGION_END
+            and self._first_line_region_marker == _REGION_START
+        ):
+            # at least 2 blank lines between #endregion and following #region
+            self._reversed_lines.extend([(None, "")] * (2 - len(blank_lines)))
+
+
+def _get_region_marker(stripped_line: str) -> int:
+    # plain slice comparisons are cheaper than startswith() method calls
+    if stripped_line[:7] == "#region":
+        return _REGION_START
+    if stripped_line[:10] == "#endregion":
+        return _REGION_END
+    return _NO_REGION_MARKER
 
 
 # pylint: disable=too-many-locals
-def _add_standalone_comments(
+def _postprocess_lines(
     formatted_lines: FormattedLines,
+    inline_comments: List[Optional[str]],
     standalone_comments: List[Optional[str]],
     indent_regex: re.Pattern,
 ) -> FormattedLines:
-    remaining_comments = standalone_comments[:]
-    postprocessed_lines = []  # type: FormattedLines
+    """adds inline and standalone comments and fixes region spacing
+    in a single backward pass"""
+    postprocessed_lines = _PostprocessedLines()
+    comment_offset = " " * INLINE_COMMENT_OFFSET
+    inline_upper_bound = len(inline_comments)
+    standalone_upper_bound = len(standalone_comments)
     currently_inside_expression = False
-    last_expression_line_no = None
+    last_expression_line_no = 0
 
     for line_no, line in reversed(formatted_lines):
         if line_no is None:
-            postprocessed_lines.append((line_no, line))
+            postprocessed_lines.prepend((line_no, line))
             currently_inside_expression = False
             continue
+
+        start = _slice_start(line_no, inline_upper_bound)
+        line_comments = inline_comments[start:inline_upper_bound]
+        inline_upper_bound = start
+        if line_comments.count(None) < len(line_comments):
+            line = comment_offset.join(
+                [line] + [c for c in line_comments if c is not None]
+            )
+
         if not currently_inside_expression:
-            postprocessed_lines.append((line_no, line))
+            postprocessed_lines.prepend((line_no, line))
             currently_inside_expression = True
             last_expression_line_no = line_no
             continue
 
-        comments = remaining_comments[line_no:last_expression_line_no]
-        remaining_comments = remaining_comments[:line_no]
-        indent = _get_greater_indent(line, postprocessed_lines[-1][1], indent_regex)
+        start = _slice_start(line_no, standalone_upper_bound)
+        comments = standalone_comments[
+            start : _slice_start(last_expression_line_no, standalone_upper_bound)
+        ]
+        standalone_upper_bound = start
+        if comments.count(None) < len(comments):
+            indent = _get_greater_indent(
+                line, postprocessed_lines.first_line(), indent_regex
+            )
+            _prepend_standalone_comments(postprocessed_lines, comments, indent)
+        postprocessed_lines.prepend((line_no, line))
 
-        reversed_comments = list(reversed(comments))
-        for i, comment in enumerate(reversed_comments):
-            if comment is None:
-                continue
-            stripped = comment.strip()
+    return postprocessed_lines.to_list()
 
-            if stripped.startswith("#region"):
-                # Insert a blank line before #region (optional)
-                postprocessed_lines.append((None, ""))
-                postprocessed_lines.append((None, f"{indent}{comment}"))
 
-            elif stripped.startswith("#endregion"):
-                # Remove up to 2 blank lines if they precede this comment
-                while postprocessed_lines and postprocessed_lines[-1][1].strip() == "":
-                    postprocessed_lines.pop()
+def _prepend_standalone_comments(
+    postprocessed_lines: _PostprocessedLines,
+    comments: List[Optional[str]],
+    indent: str,
+) -> None:
+    reversed_comments = list(reversed(comments))
+    stripped_comments = [
+        None if comment is None else comment.strip() for comment in reversed_comments
+    ]
+    region_markers = [
+        _NO_REGION_MARKER if stripped is None else _get_region_marker(stripped)
+        for stripped in stripped_comments
+    ]
+    for i, (comment, stripped) in enumerate(zip(reversed_comments, stripped_comments)):
+        if stripped is None:
+            continue
+        # indentation is whitespace, so stripped also applies to indented comment
+        indented_comment = (None, f"{indent}{comment}")
+        region_marker = region_markers[i]
 
-                postprocessed_lines.append((None, f"{indent}{comment}"))
+        if region_marker == _REGION_START:
+            # Insert a blank line before #region (optional)
+            postprocessed_lines.prepend((None, ""), "")
+            postprocessed_lines.prepend(indented_comment, stripped)
 
-                # Add 2 lines after if another #region follows
-                if i + 1 < len(reversed_comments):
-                    next_comment = reversed_comments[i + 1]
-                    if next_comment and next_comment.strip().startswith("#region"):
-                        postprocessed_lines.append((None, ""))
-                        postprocessed_lines.append((None, ""))
+        elif region_marker == _REGION_END:
+            # Remove up to 2 blank lines if they precede this comment
+            postprocessed_lines.drop_leading_blank_lines()
 
-            else:
-                # Normal comments
-                postprocessed_lines.append((None, f"{indent}{comment}"))
+            postprocessed_lines.prepend(indented_comment, stripped)
 
-        postprocessed_lines.append((line_no, line))
+            # Add 2 lines after if another #region follows
+            if i + 1 < len(region_markers) and region_markers[i + 1] == _REGION_START:
+                postprocessed_lines.prepend((None, ""), "")
+                postprocessed_lines.prepend((None, ""), "")
 
-    return list(reversed(postprocessed_lines))
+        else:
+            # Normal comments
+            postprocessed_lines.prepend(indented_comment, stripped)
 
 
-def _get_greater_indent(line_a: str, line_b: str, indent_regex: re.Pattern):
-    line_a_match = indent_regex.search(line_a)
-    line_b_match = indent_regex.search(line_b)
-    line_a_indent = "" if line_a_match is None else line_a_match.group(0)
-    line_b_indent = "" if line_b_match is None else line_b_match.group(0)
-    return line_a_indent if len(line_a_indent) > len(line_b_indent) else line_b_indent
-
-
-def _cleanup_region_spacing(formatted_lines: FormattedLines) -> FormattedLines:
-    cleaned: FormattedLines = []
-    i = 0
-    while i < len(formatted_lines):
-        line_no, line = formatted_lines[i]
-        stripped = line.strip()
-
-        if stripped.startswith("#endregion"):
-            # Remove blank lines before #endregion
-            while cleaned and cleaned[-1][1].strip() == "":
-                cleaned.pop()
-            cleaned.append((line_no, line))
-
-            # Look ahead: if next non-blank is #region, ensure exactly 2 blank lines
-            j = i + 1
-            # Count how many blank lines already exist
-            blank_lines = 0
-            while j < len(formatted_lines):
-                _, next_line = formatted_lines[j]
-                if next_line.strip() == "":
-                    blank_lines += 1
-                    j += 1
-                    continue
-                if next_line.strip().startswith("#region"):
-                    missing = 2 - blank_lines
-                    for _ in range(missing):
-                        cleaned.append((None, ""))
-                break
-        else:
-            cleaned.append((line_no, line))
+def _slice_start(index: int, length: int) -> int:
+    """normalizes index the way slicing a list of given length would
+    (negative line numbers are used by some synthetic lines)"""
+    if 0 <= index <= length:
+        return index
+    return slice(index, None).indices(length)[0]
 
-        i += 1
 
-    return cleaned
+def _get_greater_indent(line_a: str, line_b: str, indent_regex: re.Pattern):
+    line_a_match = indent_regex.match(line_a)
+    line_b_match = indent_regex.match(line_b)
+    # indent_regex accepts empty indentation, so matching always succeeds
+    assert line_a_match is not None and line_b_match is not None
+    return (
+        line_a_match.group(0)
+        if line_a_match.end() > line_b_match.end()
+        else line_b_match.group(0)
+    )